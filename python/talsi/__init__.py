@@ -1,5 +1,6 @@
+from contextlib import contextmanager
 from functools import partial
-from typing import Any, Iterable, Self
+from typing import Any, Iterable, Iterator, Self
 
 from talsi._talsi import Storage as _Storage
 from talsi._talsi import TalsiError, setup_logging
@@ -45,6 +46,24 @@ class Storage(_Storage):
         keys = self.list_keys(namespace, like=keys_like)
         return self.get_many_batched(namespace, keys, batch_size=batch_size)
 
+    @contextmanager
+    def transaction(self) -> Iterator[Self]:
+        """
+        Group write operations into a single SQLite transaction.
+
+        Operations issued inside the block join one transaction that is
+        committed when the block exits, instead of each committing on
+        their own; if the block raises, the transaction is rolled back
+        and the exception propagates.
+        """
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+
     def __enter__(self) -> Self:
         """
         Enter the context manager, returning the Storage instance.
@@ -1,101 +1,210 @@
 from __future__ import annotations
 
-import argparse
-import json
 import sys
-from typing import TYPE_CHECKING
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, NoReturn
 
 if TYPE_CHECKING:
     from talsi import Storage
 
+USAGE = "usage: talsi [-h] -f FILE {list-namespaces,list-keys,get} ...\n"
+
+HELP_TEXT = f"""\
+{USAGE}
+options:
+  -h, --help            show this help message and exit
+  -f, --file FILE       Path to the Talsi database file
+
+commands:
+  list-namespaces       List all namespaces in the database
+  list-keys             List keys in a namespace or all namespaces
+  get                   Get value(s) from a namespace
+"""
+
+# Flag -> attribute name; which command accepts which attributes.
+OPTION_NAMES = {
+    "-f": "file",
+    "--file": "file",
+    "-n": "namespace",
+    "--namespace": "namespace",
+    "-k": "key",
+    "--key": "key",
+}
+COMMAND_OPTIONS = {
+    "list-namespaces": frozenset(),
+    "list-keys": frozenset({"namespace"}),
+    "get": frozenset({"namespace", "key"}),
+}
+
 
 class CLIError(Exception):
     pass
 
 
+def _error(message: str) -> NoReturn:
+    sys.stderr.write(f"{USAGE}talsi: error: {message}\n")
+    raise SystemExit(2)
+
+
+def parse_args(argv: list[str]) -> SimpleNamespace:
+    """
+    Parse CLI arguments into a namespace.
+
+    This is deliberately a small hand-rolled parser instead of argparse;
+    the CLI only has three commands and three flags, and building an
+    ArgumentParser dominates startup time for such a simple interface.
+    """
+    args = SimpleNamespace(file=None, command=None, namespace=None, key=None)
+    tokens = iter(argv)
+    for token in tokens:
+        if token in ("-h", "--help"):
+            sys.stdout.write(HELP_TEXT)
+            raise SystemExit(0)
+        # Accept both "--file path" and "--file=path" spellings.
+        option, eq, inline_value = token.partition("=")
+        if option in OPTION_NAMES:
+            value = inline_value if eq else next(tokens, None)
+            # As in argparse, a following token that looks like an option is
+            # not a value; "-f --help" must not open a file named "--help".
+            if value is None or (not eq and value.startswith("-")):
+                _error(f"argument {option}: expected one argument")
+            setattr(args, OPTION_NAMES[option], value)
+        elif not token.startswith("-") and args.command is None:
+            if token not in COMMAND_OPTIONS:
+                choices = ", ".join(COMMAND_OPTIONS)
+                _error(f"argument command: invalid choice: {token!r} (choose from {choices})")
+            args.command = token
+        else:
+            _error(f"unrecognized arguments: {token}")
+    if args.file is None:
+        _error("the following arguments are required: -f/--file")
+    if args.command is None:
+        _error("the following arguments are required: command")
+    allowed = COMMAND_OPTIONS[args.command]
+    for name in ("namespace", "key"):
+        if getattr(args, name) is not None and name not in allowed:
+            _error(f"unrecognized arguments: --{name}")
+    if args.command == "get" and args.namespace is None:
+        _error("the following arguments are required: -n/--namespace")
+    return args
+
+
 def list_namespaces(storage: Storage):
-    for ns in storage.list_namespaces():
-        print(ns)
+    namespaces = storage.list_namespaces()
+    if namespaces:
+        sys.stdout.write("\n".join(namespaces) + "\n")
 
 
-def list_keys(storage: Storage, args: argparse.Namespace):
+def list_keys(storage: Storage, args: SimpleNamespace):
     if args.namespace:
-        namespaces = [args.namespace]
+        lines = storage.list_keys(args.namespace)
     else:
-        namespaces = storage.list_namespaces()
+        lines = [
+            f"{ns}\t{key}" for ns in storage.list_namespaces() for key in storage.list_keys(ns)
+        ]
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
 
-    for ns in namespaces:
-        keys = storage.list_keys(ns)
-        if args.namespace:
-            for key in keys:
-                print(key)
-        else:
-            for key in keys:
-                print(f"{ns}\t{key}")
+
+def _format_value(value) -> str:
+    if isinstance(value, (dict, list)):
+        # Prefer orjson when it happens to be installed; it's considerably
+        # faster than the stdlib encoder for nested structures.
+        try:
+            import orjson
+        except ImportError:
+            import json
+
+            return json.dumps(value, indent=2)
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+    return str(value)
+
+
+# Binary values smaller than this still take the buffered path; above it,
+# a single direct write to the file descriptor beats the buffer copy.
+_DIRECT_WRITE_THRESHOLD = 65536
+
+# Accumulated text rows are flushed once they exceed this many characters,
+# so peak memory stays bounded while small rows are still written batched.
+_TEXT_FLUSH_THRESHOLD = 65536
 
 
 def _dump_value(value):
-    if isinstance(value, (dict, list)):
-        print(json.dumps(value, indent=2))
-    elif isinstance(value, bytes):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        if len(value) > _DIRECT_WRITE_THRESHOLD:
+            try:
+                fd = sys.stdout.fileno()
+            except (OSError, ValueError):
+                fd = None  # not a real file (e.g. captured in tests)
+            if fd is not None:
+                import os
+
+                sys.stdout.flush()
+                view = memoryview(value)
+                while view:
+                    view = view[os.write(fd, view) :]
+                return
         sys.stdout.buffer.write(value)
     else:
-        print(value)
+        sys.stdout.write(_format_value(value) + "\n")
 
 
-def get_value(storage: Storage, args: argparse.Namespace):
+def get_value(storage: Storage, args: SimpleNamespace):
     if args.key:
         value = storage.get(args.namespace, args.key)
         if value is None:
             raise CLIError(f"Key '{args.key}' not found in namespace '{args.namespace}'")
         _dump_value(value)
     else:
-        keys = storage.list_keys(args.namespace)
-        items = storage.get_many(args.namespace, keys)
-        for key, value in items.items():
-            print(key, end="\t")
-            _dump_value(value)
+        # Stream the namespace in batches instead of materializing every
+        # value at once; a namespace full of large blobs would otherwise
+        # be held in memory in its entirety.
+        # Accumulate text rows and write them out in batches; binary values
+        # have to go to the underlying byte stream, so they flush the
+        # accumulated text first to keep the output ordered.
+        parts: list[str] = []
+        parts_len = 0
+        for key, value in storage.items_batched(args.namespace):
+            if isinstance(value, bytes):
+                parts.append(f"{key}\t")
+                sys.stdout.write("".join(parts))
+                parts.clear()
+                parts_len = 0
+                sys.stdout.flush()
+                sys.stdout.buffer.write(value)
+            else:
+                part = f"{key}\t{_format_value(value)}\n"
+                parts.append(part)
+                parts_len += len(part)
+                if parts_len >= _TEXT_FLUSH_THRESHOLD:
+                    sys.stdout.write("".join(parts))
+                    parts.clear()
+                    parts_len = 0
+        if parts:
+            sys.stdout.write("".join(parts))
+
+
+COMMAND_HANDLERS = {
+    "list-namespaces": lambda storage, args: list_namespaces(storage),
+    "list-keys": list_keys,
+    "get": get_value,
+}
 
 
 def main(args=None):
-    parser = argparse.ArgumentParser()
-    parser.add_argument("-f", "--file", required=True, help="Path to the Talsi database file")
-    subparsers = parser.add_subparsers(dest="command", required=True, help="Command to execute")
-
-    subparsers.add_parser("list-namespaces", help="List all namespaces in the database")
-
-    list_keys_parser = subparsers.add_parser(
-        "list-keys",
-        help="List keys in a namespace or all namespaces",
-    )
-    list_keys_parser.add_argument(
-        "-n",
-        "--namespace",
-        help="Namespace to list keys from (if not specified, lists keys from all namespaces)",
-    )
-
-    get_parser = subparsers.add_parser("get", help="Get value(s) from a namespace")
-    get_parser.add_argument("-n", "--namespace", required=True, help="Namespace to get values from")
-    get_parser.add_argument(
-        "-k",
-        "--key",
-        help="Key to get (if not specified, gets all keys in the namespace)",
-    )
-
-    args = parser.parse_args(args)
+    args = parse_args(sys.argv[1:] if args is None else args)
+
+    # Resolve the handler before importing the extension module, so the
+    # heavy import below can only ever happen for a runnable command.
+    handler = COMMAND_HANDLERS[args.command]
 
     from talsi import Storage
 
     try:
         with Storage(args.file) as storage:
-            if args.command == "list-namespaces":
-                list_namespaces(storage)
-            elif args.command == "list-keys":
-                list_keys(storage, args)
-            elif args.command == "get":
-                get_value(storage, args)
+            handler(storage, args)
     except CLIError as ce:
-        parser.error(str(ce))
+        _error(str(ce))
 
 
 if __name__ == "__main__":
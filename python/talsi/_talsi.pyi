@@ -1,4 +1,4 @@
-from typing import Any, AnyStr
+from typing import Any, AnyStr, Iterable
 
 class TalsiError(Exception): ...
 
@@ -8,6 +8,11 @@ class Storage:
     def __init__(self, path: str, *, allow_pickle: bool = False) -> None: ...
     def close(self) -> None: ...
 
+    # Transactions
+    def begin(self) -> None: ...
+    def commit(self) -> None: ...
+    def rollback(self) -> None: ...
+
     # Create/Update
     def set(
         self,
@@ -27,12 +32,12 @@ class Storage:
 
     # Retrieve
     def get(self, namespace: AnyStr, key: AnyStr) -> Any | None: ...
-    def get_many(self, namespace: AnyStr, keys: list[AnyStr]) -> dict[str, Any]: ...
+    def get_many(self, namespace: AnyStr, keys: Iterable[AnyStr]) -> dict[str, Any]: ...
     def has(self, namespace: AnyStr, key: AnyStr) -> bool: ...
-    def has_many(self, namespace: AnyStr, keys: list[AnyStr]) -> frozenset[str]: ...
+    def has_many(self, namespace: AnyStr, keys: Iterable[AnyStr]) -> frozenset[str]: ...
     def list_keys(self, namespace: AnyStr, *, like: AnyStr | None = None) -> list[str]: ...
     def list_namespaces(self) -> list[str]: ...
 
     # Delete
     def delete(self, namespace: AnyStr, key: AnyStr) -> int: ...
-    def delete_many(self, namespace: AnyStr, keys: list[AnyStr]) -> int: ...
+    def delete_many(self, namespace: AnyStr, keys: Iterable[AnyStr]) -> int: ...
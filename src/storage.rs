@@ -6,8 +6,9 @@ use crate::typ::{CodecsBlob, DataAndMnemonic, DataAndMnemonics, StringOrByteStri
 use crate::utils;
 use either::Either;
 use eyre::Context;
+use pyo3::exceptions::PyTypeError;
 use pyo3::prelude::*;
-use pyo3::types::{PyDict, PyFrozenSet};
+use pyo3::types::{PyBytes, PyDict, PyFrozenSet, PyString};
 use pyo3::{Bound, Py, PyAny, PyErr, PyResult, Python, pyclass, pymethods};
 use rayon::prelude::*;
 use rusqlite::limits::Limit;
@@ -67,6 +68,24 @@ fn strings_or_bytestrings_as_strings(sobses: Vec<StringOrByteString>) -> eyre::R
     Ok(res)
 }
 
+/// Extract keys from any iterable (list, tuple, dict view, generator, ...)
+/// without requiring the caller to materialize a list first.
+fn keys_from_iterable(keys: &Bound<'_, PyAny>) -> PyResult<Vec<StringOrByteString>> {
+    if let Ok(keys) = keys.extract::<Vec<StringOrByteString>>() {
+        return Ok(keys);
+    }
+    if keys.is_instance_of::<PyString>() || keys.is_instance_of::<PyBytes>() {
+        return Err(PyTypeError::new_err(
+            "keys must be an iterable of keys, not a single string",
+        ));
+    }
+    let mut res = Vec::with_capacity(keys.len().unwrap_or(0));
+    for key in keys.try_iter()? {
+        res.push(key?.extract::<StringOrByteString>()?);
+    }
+    Ok(res)
+}
+
 struct StorageSettings {
     pub allow_pickle: bool,
     pub compression: CompressionAlgorithm,
@@ -216,8 +235,14 @@ impl Storage {
             .as_ref()
             .ok_or_else(|| to_talsi_error("Connection is closed"))?;
         self.ensure_namespace_table(conn, namespace)?;
-        let tx = conn.unchecked_transaction().map_err(to_talsi_error)?;
-        let mut stmt = tx
+        // If the caller has opened an explicit transaction via begin(),
+        // join it instead of wrapping this call in one of our own.
+        let tx = if conn.is_autocommit() {
+            Some(conn.unchecked_transaction().map_err(to_talsi_error)?)
+        } else {
+            None
+        };
+        let mut stmt = conn
             .prepare_cached(&format!("INSERT OR REPLACE INTO {table_name} (key, codecs, value, created_at_ms, expires_at_ms) VALUES (?, ?, ?, ?, ?)"))
             .map_err(to_talsi_error)?;
         for iit in iits {
@@ -236,7 +261,9 @@ impl Storage {
             .map_err(to_talsi_error)?;
         }
         drop(stmt);
-        tx.commit().map_err(to_talsi_error)?;
+        if let Some(tx) = tx {
+            tx.commit().map_err(to_talsi_error)?;
+        }
         Ok(iits.len())
     }
 
@@ -247,13 +274,17 @@ impl Storage {
         let conn = maybe_conn
             .as_ref()
             .ok_or_else(|| to_talsi_error("Connection is closed"))?;
-        let tx = conn.unchecked_transaction().map_err(to_talsi_error)?;
+        let tx = if conn.is_autocommit() {
+            Some(conn.unchecked_transaction().map_err(to_talsi_error)?)
+        } else {
+            None
+        };
         let mut n = 0;
         let table_name = get_quoted_table_name(&namespace);
         for keys in keys.chunks(self.max_num_binds) {
             let placeholders = keys.iter().map(|_| "?").collect::<Vec<_>>().join(",");
             let query = &format!("DELETE FROM {table_name} WHERE key IN ({placeholders})");
-            let mut stmt = match ignore_no_such_table(tx.prepare(query)).map_err(to_talsi_error)? {
+            let mut stmt = match ignore_no_such_table(conn.prepare(query)).map_err(to_talsi_error)? {
                 StatementResult::Stmt(stmt) => stmt,
                 StatementResult::NoSuchTable => {
                     return Ok(0);
@@ -273,7 +304,9 @@ impl Storage {
                 }
             }
         }
-        tx.commit().map_err(to_talsi_error)?;
+        if let Some(tx) = tx {
+            tx.commit().map_err(to_talsi_error)?;
+        }
         Ok(n)
     }
 }
@@ -318,6 +351,43 @@ impl Storage {
         Ok(())
     }
 
+    /// Begin an explicit transaction. Until the matching `commit` or
+    /// `rollback`, write operations join this transaction instead of each
+    /// committing on their own.
+    fn begin(&self, py: Python<'_>) -> PyResult<()> {
+        py.detach(|| {
+            let maybe_conn = self.conn.lock().unwrap();
+            let conn = maybe_conn
+                .as_ref()
+                .ok_or_else(|| to_talsi_error("Connection is closed"))?;
+            conn.execute_batch("BEGIN IMMEDIATE").map_err(to_talsi_error)
+        })
+    }
+
+    fn commit(&self, py: Python<'_>) -> PyResult<()> {
+        py.detach(|| {
+            let maybe_conn = self.conn.lock().unwrap();
+            let conn = maybe_conn
+                .as_ref()
+                .ok_or_else(|| to_talsi_error("Connection is closed"))?;
+            conn.execute_batch("COMMIT").map_err(to_talsi_error)
+        })
+    }
+
+    fn rollback(&self, py: Python<'_>) -> PyResult<()> {
+        py.detach(|| {
+            let maybe_conn = self.conn.lock().unwrap();
+            let conn = maybe_conn
+                .as_ref()
+                .ok_or_else(|| to_talsi_error("Connection is closed"))?;
+            conn.execute_batch("ROLLBACK").map_err(to_talsi_error)?;
+            // Any namespace tables created inside the transaction were
+            // rolled back with it, so the cache can't be trusted anymore.
+            self.known_namespaces.write().unwrap().clear();
+            Ok(())
+        })
+    }
+
     #[pyo3(signature = (namespace, key, value, *, ttl_ms=None))]
     #[instrument(skip_all)]
     fn set(
@@ -453,9 +523,9 @@ impl Storage {
         &self,
         py: Python<'_>,
         namespace: StringOrByteString,
-        keys: Vec<StringOrByteString>,
+        keys: Bound<'_, PyAny>,
     ) -> PyResult<Py<PyFrozenSet>> {
-        let keys = strings_or_bytestrings_as_strings(keys)?;
+        let keys = strings_or_bytestrings_as_strings(keys_from_iterable(&keys)?)?;
         let namespace = string_or_bytestring_as_string(namespace)?;
         let table_name = get_quoted_table_name(&namespace);
         let extant_keys = py.detach(|| {
@@ -500,9 +570,9 @@ impl Storage {
     fn delete_many(
         &self,
         namespace: StringOrByteString,
-        keys: Vec<StringOrByteString>,
+        keys: Bound<'_, PyAny>,
     ) -> PyResult<usize> {
-        let keys = strings_or_bytestrings_as_strings(keys)?;
+        let keys = strings_or_bytestrings_as_strings(keys_from_iterable(&keys)?)?;
         let namespace = string_or_bytestring_as_string(namespace)?;
         self.internal_delete(namespace, &keys)
     }
@@ -577,9 +647,9 @@ impl Storage {
         &self,
         py: Python<'_>,
         namespace: StringOrByteString,
-        keys: Vec<StringOrByteString>,
+        keys: Bound<'_, PyAny>,
     ) -> PyResult<Py<PyAny>> {
-        let keys = strings_or_bytestrings_as_strings(keys)?;
+        let keys = strings_or_bytestrings_as_strings(keys_from_iterable(&keys)?)?;
         let namespace = string_or_bytestring_as_string(namespace)?;
         let table_name = get_quoted_table_name(&namespace);
         let isrs = py.detach(|| {
@@ -656,7 +726,7 @@ impl Storage {
                 None => format!("SELECT key FROM {table_name}"),
             };
             let mut stmt =
-                match ignore_no_such_table(conn.prepare(&query)).map_err(to_talsi_error)? {
+                match ignore_no_such_table(conn.prepare_cached(&query)).map_err(to_talsi_error)? {
                     StatementResult::Stmt(stmt) => stmt,
                     StatementResult::NoSuchTable => {
                         return Ok::<Vec<String>, PyErr>(Vec::new());
@@ -685,7 +755,7 @@ impl Storage {
                 .as_ref()
                 .ok_or_else(|| to_talsi_error("Connection is closed"))?;
             let mut stmt = conn
-                .prepare("SELECT SUBSTR(name, 4) FROM sqlite_master WHERE type='table' AND name LIKE 'tl_%'")
+                .prepare_cached("SELECT SUBSTR(name, 4) FROM sqlite_master WHERE type='table' AND name LIKE 'tl_%'")
                 .map_err(to_talsi_error)?;
             let namespaces = stmt
                 .query_map([], |row| row.get::<_, String>(0))
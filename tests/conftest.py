@@ -0,0 +1,114 @@
+import shutil
+
+import pytest
+import talsi
+
+storage_types = ["pickle:snappy", "json:snappy", "pickle:zstd", "json:zstd"]
+
+
+def _storage_kwargs(storage_type: str) -> dict:
+    type, _, compression = storage_type.partition(":")
+    if type == "pickle":
+        return {"allow_pickle": True, "compression": compression}
+    if type == "json":
+        return {"allow_pickle": False, "compression": compression}
+    raise ValueError(f"Unknown storage type: {storage_type}")
+
+
+class NamespacedStorage:
+    """
+    Proxy that prefixes every namespace, so tests can share one open
+    Storage without seeing each other's data.
+    """
+
+    def __init__(self, storage: talsi.Storage, prefix: str):
+        self._storage = storage
+        self._prefix = prefix
+
+    def _ns(self, namespace):
+        if isinstance(namespace, bytes):
+            return self._prefix.encode() + namespace
+        return self._prefix + namespace
+
+    def set(self, namespace, key, value, **kwargs):
+        return self._storage.set(self._ns(namespace), key, value, **kwargs)
+
+    def set_many(self, namespace, values, **kwargs):
+        return self._storage.set_many(self._ns(namespace), values, **kwargs)
+
+    def get(self, namespace, key):
+        return self._storage.get(self._ns(namespace), key)
+
+    def get_many(self, namespace, keys):
+        return self._storage.get_many(self._ns(namespace), keys)
+
+    def has(self, namespace, key):
+        return self._storage.has(self._ns(namespace), key)
+
+    def has_many(self, namespace, keys):
+        return self._storage.has_many(self._ns(namespace), keys)
+
+    def delete(self, namespace, key):
+        return self._storage.delete(self._ns(namespace), key)
+
+    def delete_many(self, namespace, keys):
+        return self._storage.delete_many(self._ns(namespace), keys)
+
+    def list_keys(self, namespace, **kwargs):
+        return self._storage.list_keys(self._ns(namespace), **kwargs)
+
+
+@pytest.fixture(scope="session")
+def _storage_templates(tmp_path_factory):
+    """
+    Get pre-initialized (empty) database files, one per storage type.
+
+    Copying a template file is cheaper than re-running database
+    initialization for every test that needs a fresh database.
+    """
+    templates = {}
+
+    def get_template(storage_type: str):
+        if storage_type not in templates:
+            path = tmp_path_factory.mktemp("templates") / f"{storage_type.replace(':', '_')}.db"
+            talsi.Storage(str(path), **_storage_kwargs(storage_type)).close()
+            templates[storage_type] = path
+        return templates[storage_type]
+
+    return get_template
+
+
+@pytest.fixture(scope="session")
+def _storage_pool(tmp_path_factory):
+    """One open Storage per storage type, shared for the whole session."""
+    pool = {}
+
+    def get_storage(storage_type: str):
+        if storage_type not in pool:
+            path = tmp_path_factory.mktemp("pool") / f"{storage_type.replace(':', '_')}.db"
+            pool[storage_type] = talsi.Storage(str(path), **_storage_kwargs(storage_type))
+        return pool[storage_type]
+
+    yield get_storage
+    for storage in pool.values():
+        storage.close()
+
+
+@pytest.fixture
+def storage(request, _storage_pool):
+    """
+    A namespaced view into a shared per-storage-type database.
+
+    Reusing one open connection avoids per-test database setup; the
+    per-test namespace prefix keeps tests isolated from each other.
+    """
+    return NamespacedStorage(_storage_pool(request.param), f"{request.node.name}/")
+
+
+@pytest.fixture
+def fresh_storage(request, tmp_path, _storage_templates):
+    """A private Storage for tests that need to close or abuse theirs."""
+    template = _storage_templates(request.param)
+    db_path = tmp_path / template.name
+    shutil.copyfile(template, db_path)
+    return talsi.Storage(str(db_path), **_storage_kwargs(request.param))
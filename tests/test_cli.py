@@ -1,13 +1,14 @@
 import contextlib
 import io
 import json
+import sys
 from collections import defaultdict
 
 import pytest
 import talsi
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def test_db(tmp_path_factory):
     """Create a test database with sample data."""
     db_path = tmp_path_factory.mktemp("talsi") / "test.db"
@@ -30,11 +31,29 @@ class CLIRunError(Exception):
         super().__init__(error)
 
 
+@contextlib.contextmanager
+def capture_stdout():
+    """
+    Capture both text and binary stdout writes into a single byte buffer.
+
+    Unlike `redirect_stdout(StringIO())`, this gives the CLI a real
+    `.buffer` to write binary values to, and both kinds of writes land
+    in the same buffer in order.
+    """
+    buf = io.BytesIO()
+    old_stdout = sys.stdout
+    sys.stdout = io.TextIOWrapper(buf, encoding="utf-8", write_through=True)
+    try:
+        yield buf
+    finally:
+        sys.stdout = old_stdout
+
+
 def run_cli(*args) -> str:
     from talsi.__main__ import main
 
     with (
-        contextlib.redirect_stdout(io.StringIO()) as f,
+        capture_stdout() as buf,
         contextlib.redirect_stderr(io.StringIO()) as ferr,
     ):
         try:
@@ -44,27 +63,28 @@ def run_cli(*args) -> str:
         except SystemExit as se:
             raise CLIRunError(
                 "CLI exited",
-                f.getvalue().strip(),
+                buf.getvalue().decode().rstrip("\n"),
                 ferr.getvalue().strip(),
                 se.code,
             ) from se
         except Exception as e:
-            raise CLIRunError(str(e), f.getvalue().strip(), ferr.getvalue().strip()) from e
+            raise CLIRunError(
+                str(e),
+                buf.getvalue().decode().rstrip("\n"),
+                ferr.getvalue().strip(),
+            ) from e
 
-        return f.getvalue().strip()
+        return buf.getvalue().decode().rstrip("\n")
 
 
 def run_cli_binary(*args) -> bytes:
     from talsi.__main__ import main
 
-    fb = io.BytesIO()
-    with contextlib.redirect_stdout(io.StringIO()) as f:
-        f.buffer = fb
+    with capture_stdout() as buf:
         ret = main(list(args))
         if ret:
             raise ValueError(f"CLI exited with code {ret}")
-        assert not f.getvalue(), "nothing should have been written to stdout text"
-        return fb.getvalue()
+        return buf.getvalue()
 
 
 def test_list_namespaces(test_db):
@@ -93,6 +113,20 @@ def test_list_keys_single_namespace(test_db):
     assert set(result.split("\n")) == {"alice", "bob"}
 
 
+def test_option_equals_syntax(test_db):
+    """Test that --option=value spellings are accepted."""
+    result = run_cli(f"--file={test_db}", "list-keys", "--namespace=users")
+    assert set(result.split("\n")) == {"alice", "bob"}
+
+
+def test_option_with_missing_value(test_db):
+    """Test that an option swallowing the next flag errors instead."""
+    with pytest.raises(CLIRunError) as ei:
+        run_cli("-f", "--help", "list-namespaces")
+    assert ei.value.status_code == 2
+    assert "argument -f: expected one argument" in ei.value.stderr
+
+
 def test_list_keys_empty_namespace(test_db):
     """Test listing keys from a non-existent namespace."""
     result = run_cli("-f", test_db, "list-keys", "-n", "nonexistent")
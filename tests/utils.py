@@ -0,0 +1,89 @@
+import contextlib
+import functools
+import time
+
+n_test_keys = 500
+
+
+@contextlib.contextmanager
+def measure_duration(name):
+    start = time.perf_counter_ns()
+    yield
+    end = time.perf_counter_ns()
+    time_taken_fmt = f"{(end - start) / 1e9:.3f}"
+    print(f"{name:35s} took {time_taken_fmt:7} seconds")
+
+
+# Exact-type dispatch for to_bytes; bytes(b) returns b itself for bytes
+# input, so the common cases avoid both an isinstance branch and a copy.
+_to_bytes_dispatch = {
+    bytes: bytes,
+    str: str.encode,
+    int: lambda i: str(i).encode(),
+}
+
+
+def to_bytes(key):
+    cast = _to_bytes_dispatch.get(key.__class__)
+    if cast is not None:
+        return cast(key)
+    return str(key).encode()
+
+
+# Shared base buffer for the "long" values; each value is a 10 kB window
+# into it instead of an independently constructed bytes object. The buffer
+# is 256-periodic and the window stride is 100, so the windows alone repeat
+# every 64 keys; the per-key prefix below is what makes the values distinct
+# (so a bug that swapped values between keys would still be caught).
+_long_value_base = bytes(range(256)) * 250
+
+
+@functools.lru_cache(maxsize=2)
+def _long_payloads(n: int) -> list[bytes]:
+    # Cached separately from get_values so the payload objects are shared
+    # between the str- and bytes-keyed variants.
+    return [str(x).encode() + _long_value_base[x * 100 : x * 100 + 10000] for x in range(n)]
+
+
+@functools.lru_cache(maxsize=4)
+def get_values(key_bytes: bool, n: int):
+    # The returned dicts are cached and shared across tests and
+    # parametrizations, so treat them as immutable.
+    cast_key = to_bytes if key_bytes else str
+    long_values = dict(zip(map(cast_key, range(n)), _long_payloads(n), strict=True))
+    short_values = {
+        cast_key(x): f"hello {x}" if x % 2 else {"structured": f"hello {x}"} for x in range(n)
+    }
+    return (long_values, short_values)
+
+
+@functools.lru_cache(maxsize=2)
+def get_values_raw(n: int) -> dict[bytes, bytes]:
+    # Values that are already bytes skip the pickle/json step, so timings
+    # over this payload isolate SQLite/IO cost from serialization cost.
+    return dict(zip((str(x).encode() for x in range(n)), _long_payloads(n), strict=True))
+
+
+def dict_to_bytes_keys(d):
+    # Keys are homogeneously typed in these tests, so one check on the
+    # first key tells whether the per-key conversion can be skipped.
+    if d and next(iter(d)).__class__ is bytes:
+        return d
+    return {to_bytes(key): value for key, value in d.items()}
+
+
+_MISSING = object()
+
+
+def check_bk_dict_equal(d1, d2):
+    if len(d1) != len(d2):
+        return False
+    if not d1:
+        return True
+    if next(iter(d1)).__class__ is bytes and next(iter(d2)).__class__ is bytes:
+        return d1 == d2
+    # Convert only one side; stream the other through it, bailing out on
+    # the first mismatch instead of materializing a second dict. The
+    # sentinel keeps a missing key distinct from a legitimately-None value.
+    d2b = dict_to_bytes_keys(d2)
+    return all(d2b.get(to_bytes(k), _MISSING) == v for k, v in d1.items())